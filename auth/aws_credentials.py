@@ -1,13 +1,19 @@
 from google.auth import identity_pool
 from google.auth.transport.requests import Request
+import requests
 import boto3
-from typing import Dict, Any, Optional
-from datetime import datetime, timedelta
+from typing import Dict, Any, Optional, Tuple
+from datetime import datetime, timezone
 import os
 from botocore.config import Config
-from fastapi import HTTPException
+from botocore.exceptions import ClientError
+from auth.ttl_cache import TTLRefreshCache
 
-class AWSCredentialsManager:
+# STS errors that will not go away by retrying straight away. ExpiredTokenException
+# is left out: every retry exchanges a freshly minted Google token.
+NEGATIVE_CACHE_ERROR_CODES = {"AccessDenied", "InvalidIdentityToken", "IDPRejectedClaim"}
+
+class AWSCredentialsManager(TTLRefreshCache[Dict[str, Any]]):
     def __init__(self):
         self.aws_role_arn = os.getenv("AWS_ROLE_ARN")
         self.workload_identity_pool = os.getenv("WORKLOAD_IDENTITY_POOL")
@@ -17,90 +23,70 @@ class AWSCredentialsManager:
         if not all([self.aws_role_arn, self.workload_identity_pool, self.provider_id]):
             raise ValueError("Missing required AWS configuration")
         
-        # Cache for credentials
-        self._credentials_cache: Optional[Dict[str, Any]] = None
-        self._credentials_expiry: Optional[datetime] = None
+        super().__init__("AWS credentials", shared_key=f"aws:{self.aws_role_arn}")
+        
+        # Built once and reused across refreshes, pinned to the regional endpoint
+        self._sts_client = boto3.client(
+            'sts',
+            region_name=self.region,
+            endpoint_url=f"https://sts.{self.region}.amazonaws.com",
+            config=Config(
+                retries={
+                    'max_attempts': 3,
+                    'mode': 'adaptive'
+                },
+                tcp_keepalive=True,
+                connect_timeout=2,
+                read_timeout=5
+            )
+        )
+        
         self._google_credentials: Optional[identity_pool.Credentials] = None
+        # Keeps connections to the token endpoint alive across refreshes
+        self._gauth_transport = Request(session=requests.Session())
         
         # Configuration
         self.session_duration = 3600  # 1 hour
-        self.refresh_buffer = 300     # 5 minutes
 
     async def get_credentials(self) -> Dict[str, Any]:
         """Get AWS credentials with caching"""
-        try:
-            if self._should_refresh_credentials():
-                await self._refresh_credentials()
-            return self._credentials_cache
-        except Exception as e:
-            self.clear_cache()
-            raise HTTPException(
-                status_code=500,
-                detail=f"Failed to get AWS credentials: {str(e)}"
-            )
-
-    def _should_refresh_credentials(self) -> bool:
-        """Check if credentials need to be refreshed"""
-        if not self._credentials_cache or not self._credentials_expiry:
-            return True
-        
-        # Refresh if within buffer period of expiry
-        return datetime.utcnow() >= (self._credentials_expiry - timedelta(seconds=self.refresh_buffer))
+        return await self.get()
 
-    async def _refresh_credentials(self) -> None:
-        """Refresh AWS credentials using Workload Identity Federation"""
-        try:
-            # Get or refresh Google credentials
-            if not self._google_credentials:
-                self._google_credentials = identity_pool.Credentials(
-                    audience=self.provider_id,
-                    subject_token_type="urn:ietf:params:oauth:token-type:jwt",
-                    token_url=self.workload_identity_pool,
-                    service_account_impersonation_url=None
-                )
-            
-            self._google_credentials.refresh(Request())
-            
-            # Exchange Google token for AWS credentials
-            sts_client = boto3.client('sts', region_name=self.region)
-            response = sts_client.assume_role_with_web_identity(
-                RoleArn=self.aws_role_arn,
-                RoleSessionName=f'bedrock-proxy-{datetime.utcnow().strftime("%Y%m%d-%H%M%S")}',
-                WebIdentityToken=self._google_credentials.token,
-                DurationSeconds=self.session_duration
-            )
-            
-            # Cache the credentials
-            self._credentials_cache = {
-                'aws_access_key_id': response['Credentials']['AccessKeyId'],
-                'aws_secret_access_key': response['Credentials']['SecretAccessKey'],
-                'aws_session_token': response['Credentials']['SessionToken']
-            }
-            
-            # Set expiry time
-            self._credentials_expiry = datetime.strptime(
-                response['Credentials']['Expiration'].strftime("%Y-%m-%d %H:%M:%S"),
-                "%Y-%m-%d %H:%M:%S"
+    def _fetch(self) -> Tuple[Dict[str, Any], float]:
+        """Exchange a fresh Google token for AWS credentials (blocking)"""
+        # Get or refresh Google credentials
+        if not self._google_credentials:
+            self._google_credentials = identity_pool.Credentials(
+                audience=self.provider_id,
+                subject_token_type="urn:ietf:params:oauth:token-type:jwt",
+                token_url=self.workload_identity_pool,
+                service_account_impersonation_url=None
             )
-            
-        except Exception as e:
-            self.clear_cache()
-            raise Exception(f"Failed to refresh AWS credentials: {str(e)}")
-
-    async def get_boto3_config(self) -> Config:
-        """Get boto3 configuration with current credentials"""
-        credentials = await self.get_credentials()
-        return Config(
-            region_name=self.region,
-            credentials=credentials,
-            retries={
-                'max_attempts': 3,
-                'mode': 'standard'
-            }
+        
+        self._google_credentials.refresh(self._gauth_transport)
+        
+        # Exchange Google token for AWS credentials
+        response = self._sts_client.assume_role_with_web_identity(
+            RoleArn=self.aws_role_arn,
+            RoleSessionName=f'bedrock-proxy-{datetime.now(timezone.utc).strftime("%Y%m%d-%H%M%S")}',
+            WebIdentityToken=self._google_credentials.token,
+            DurationSeconds=self.session_duration
         )
+        
+        credentials = {
+            'aws_access_key_id': response['Credentials']['AccessKeyId'],
+            'aws_secret_access_key': response['Credentials']['SecretAccessKey'],
+            'aws_session_token': response['Credentials']['SessionToken']
+        }
+        # botocore already parses Expiration into a timezone-aware datetime
+        ttl = (response['Credentials']['Expiration'] - datetime.now(timezone.utc)).total_seconds()
+        return credentials, ttl
+
+    def _is_permanent_failure(self, error: Exception) -> bool:
+        """Check if STS rejected the exchange in a way retrying will not fix"""
+        return isinstance(error, ClientError) and error.response.get('Error', {}).get('Code') in NEGATIVE_CACHE_ERROR_CODES
 
     def clear_cache(self) -> None:
         """Clear credentials cache"""
-        self._credentials_cache = None
-        self._credentials_expiry = None
+        super().clear_cache()
         self._google_credentials = None
@@ -1,12 +1,31 @@
 # auth/gcp_credentials.py
 from google.auth import identity_pool
+from google.auth.exceptions import GoogleAuthError
 from google.auth.transport.requests import Request
-from typing import Dict, Optional
-from datetime import datetime, timedelta
+import json
+from datetime import datetime, timezone
+import requests
+from typing import Any, Dict, Optional, Tuple
 import os
-from fastapi import HTTPException
+from auth.ttl_cache import TTLRefreshCache
 
-class GCPTokenManager:
+# OAuth errors that will not go away by retrying straight away
+NEGATIVE_CACHE_ERROR_CODES = {"invalid_grant", "invalid_client", "unauthorized_client", "invalid_scope"}
+
+def _oauth_error_code(error: GoogleAuthError) -> Optional[str]:
+    """Extract the OAuth error code from the response body carried by a google-auth error"""
+    for arg in error.args:
+        body: Any = arg
+        if isinstance(arg, (str, bytes)):
+            try:
+                body = json.loads(arg)
+            except ValueError:
+                continue
+        if isinstance(body, dict) and isinstance(body.get("error"), str):
+            return body["error"]
+    return None
+
+class GCPTokenManager(TTLRefreshCache[str]):
     def __init__(self):
         self.workload_identity_pool = os.getenv("GCP_WORKLOAD_IDENTITY_POOL")
         self.provider_id = os.getenv("GCP_PROVIDER_ID")
@@ -14,45 +33,45 @@ class GCPTokenManager:
         if not all([self.workload_identity_pool, self.provider_id]):
             raise ValueError("Missing required GCP configuration")
         
-        self.token_cache: Optional[str] = None
-        self.token_expiry: Optional[datetime] = None
+        super().__init__(
+            "Google Cloud token",
+            shared_key=f"gcp:{self.workload_identity_pool}:{self.provider_id}"
+        )
+        
         self._credentials: Optional[identity_pool.Credentials] = None
-        self.refresh_buffer = 300  # 5 minutes
+        # Keeps connections to the token endpoint alive across refreshes
+        self._gauth_transport = Request(session=requests.Session())
 
     async def get_token(self) -> str:
         """Get Google Cloud token with caching"""
-        if self._is_token_valid():
-            return self.token_cache
+        return await self.get()
 
-        try:
-            if not self._credentials:
-                self._credentials = identity_pool.Credentials(
-                    audience=self.provider_id,
-                    subject_token_type="urn:ietf:params:oauth:token-type:jwt",
-                    token_url=self.workload_identity_pool,
-                    service_account_impersonation_url=None,
-                    scope=['https://www.googleapis.com/auth/cloud-platform']
-                )
-            
-            self._credentials.refresh(Request())
-            
-            self.token_cache = self._credentials.token
-            self.token_expiry = datetime.now() + timedelta(seconds=3600)  # 1 hour
-            
-            return self.token_cache
-        except Exception as e:
-            self.clear_cache()
-            raise HTTPException(
-                status_code=500,
-                detail=f"Failed to get Google Cloud token: {str(e)}"
+    def _fetch(self) -> Tuple[str, float]:
+        """Refresh the identity pool credentials and return the new token (blocking)"""
+        if not self._credentials:
+            self._credentials = identity_pool.Credentials(
+                audience=self.provider_id,
+                subject_token_type="urn:ietf:params:oauth:token-type:jwt",
+                token_url=self.workload_identity_pool,
+                service_account_impersonation_url=None,
+                scope=['https://www.googleapis.com/auth/cloud-platform']
             )
+        
+        self._credentials.refresh(self._gauth_transport)
+        
+        expiry = self._credentials.expiry
+        if expiry is None:
+            return self._credentials.token, 3600  # 1 hour
+        if expiry.tzinfo is None:
+            # google-auth reports expiry as naive UTC
+            expiry = expiry.replace(tzinfo=timezone.utc)
+        return self._credentials.token, (expiry - datetime.now(timezone.utc)).total_seconds()
 
-    def _is_token_valid(self) -> bool:
-        """Check if cached token is still valid"""
-        if not self.token_cache or not self.token_expiry:
+    def _is_permanent_failure(self, error: Exception) -> bool:
+        """Check if the token exchange was rejected in a way retrying will not fix"""
+        if not isinstance(error, GoogleAuthError) or error.retryable:
             return False
-        
-        return datetime.now() < (self.token_expiry - timedelta(seconds=self.refresh_buffer))
+        return _oauth_error_code(error) in NEGATIVE_CACHE_ERROR_CODES
 
     async def get_authorization_headers(self) -> Dict[str, str]:
         """Get headers with valid Google Cloud token"""
@@ -64,6 +83,5 @@ class GCPTokenManager:
 
     def clear_cache(self) -> None:
         """Clear token cache"""
-        self.token_cache = None
-        self.token_expiry = None
+        super().clear_cache()
         self._credentials = None
@@ -0,0 +1,106 @@
+# auth/shared_cache.py
+import fcntl
+import hashlib
+import json
+import mmap
+import os
+import stat
+import struct
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional
+
+def _check_private(st: os.stat_result, is_type: Callable[[int], bool]) -> None:
+    """Refuse paths another local user could have planted or can open"""
+    if not is_type(st.st_mode) or st.st_uid != os.getuid() or st.st_mode & 0o077:
+        raise PermissionError("Shared cache path is not private to this user")
+
+def _private_dir() -> str:
+    """Per-user 0700 directory on tmpfs, so no entry outlives the boot its deadline belongs to"""
+    base = os.getenv("XDG_RUNTIME_DIR")
+    if not base:
+        if not os.path.isdir("/dev/shm"):
+            # A disk-backed fallback would keep monotonic deadlines across reboots
+            raise FileNotFoundError("No memory-backed directory for the shared cache")
+        base = "/dev/shm"
+
+    path = os.path.join(base, f"aiproxy-{os.getuid()}")
+    try:
+        os.mkdir(path, 0o700)
+    except FileExistsError:
+        pass
+    _check_private(os.lstat(path), stat.S_ISDIR)
+    return path
+
+class SharedCredentialsCache:
+    """Credentials entry in a memory-mapped file so every worker on the host sees one copy"""
+
+    SIZE = 4096  # STS session tokens alone can exceed 1 KB
+    _HEADER = struct.Struct("I")
+
+    def __init__(self, key: str):
+        name = "credentials-" + hashlib.sha256(key.encode()).hexdigest()[:16]
+        self._path = os.path.join(_private_dir(), name)
+
+        fd = os.open(self._path, os.O_RDWR | os.O_CREAT | os.O_NOFOLLOW | os.O_CLOEXEC, 0o600)
+        try:
+            _check_private(os.fstat(fd), stat.S_ISREG)
+            # The file doubles as the inter-process lock
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            try:
+                if os.fstat(fd).st_size < self.SIZE:
+                    os.ftruncate(fd, self.SIZE)
+            finally:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            self._buf = mmap.mmap(fd, self.SIZE)
+        except BaseException:
+            os.close(fd)
+            raise
+        self._fd = fd
+
+    @contextmanager
+    def lock(self) -> Iterator[None]:
+        """Hold the inter-process lock; only the holder may refresh the entry"""
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def read(self) -> Optional[Dict[str, Any]]:
+        """Return the stored entry, or None if there is no usable one"""
+        (length,) = self._HEADER.unpack_from(self._buf, 0)
+        start = self._HEADER.size
+        if not length or start + length > self.SIZE:
+            return None
+
+        try:
+            entry = json.loads(self._buf[start:start + length])
+        except ValueError:
+            # Corrupt or truncated entry, the next write replaces it
+            return None
+        return entry if isinstance(entry, dict) else None
+
+    def write(self, entry: Dict[str, Any]) -> None:
+        """Replace the stored entry; callers must hold the lock"""
+        data = json.dumps(entry).encode()
+        start = self._HEADER.size
+        if start + len(data) > self.SIZE:
+            raise ValueError("Credentials entry too large for shared cache")
+
+        self._buf[start:start + len(data)] = data
+        self._HEADER.pack_into(self._buf, 0, len(data))
+
+    def close(self) -> None:
+        """Release this worker's mapping; the entry stays for the other workers"""
+        self._buf.close()
+        os.close(self._fd)
+
+def open_shared_cache(key: str) -> Optional[SharedCredentialsCache]:
+    """Attach to the shared cache for key, or None if disabled or unavailable"""
+    if os.getenv("SHARED_CREDENTIALS_CACHE", "false").lower() != "true":
+        return None
+
+    try:
+        return SharedCredentialsCache(key)
+    except OSError:
+        return None
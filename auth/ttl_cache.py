@@ -0,0 +1,210 @@
+# auth/ttl_cache.py
+import asyncio
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Generic, List, Optional, Tuple, TypeVar
+from fastapi import HTTPException
+from auth.shared_cache import open_shared_cache
+
+T = TypeVar("T")
+
+class TTLRefreshCache(ABC, Generic[T]):
+    """
+    Value fetched on demand and refreshed before it expires.
+
+    Subclasses implement _fetch. Refreshes are single-flight, start early in the
+    background, replay permanent failures for a short while and, when a shared key
+    is given, are shared with the other workers on this host.
+    """
+
+    def __init__(self, name: str, shared_key: Optional[str] = None):
+        self.name = name
+        self.cached_value: Optional[T] = None
+        self.expiry: Optional[float] = None  # time.monotonic() deadline
+
+        # Configuration
+        self.refresh_buffer = 300      # 5 minutes
+        self.negative_cache_ttl = 120  # 2 minutes
+        self.min_refresh_interval = 30  # floor between early refreshes, for short TTLs
+        self._last_refresh_attempt: Optional[float] = None
+
+        # Value shared with the other workers on this host
+        self._shared_cache = open_shared_cache(shared_key) if shared_key else None
+
+        # Single-flight refresh: concurrent callers wait on one fetch
+        self._refresh_lock = asyncio.Lock()
+        self._refresh_task: Optional[asyncio.Task] = None
+        # Outcome of the latest attempt, shared with callers that waited on it
+        self._refresh_attempts = 0
+        self._refresh_error: Optional[Exception] = None
+        # Own thread so refreshes never queue behind Bedrock calls in the default executor
+        self._refresh_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ttl-refresh")
+
+        # Recent permanent failure, replayed until it expires
+        self._negative_cache: Optional[Tuple[float, Exception]] = None
+
+        # Callbacks run whenever the cache is cleared
+        self._clear_listeners: List[Callable[[], None]] = []
+
+    @abstractmethod
+    def _fetch(self) -> Tuple[T, float]:
+        """Fetch a fresh value and its time to live in seconds (blocking)"""
+
+    def _is_permanent_failure(self, error: Exception) -> bool:
+        """Check if a fetch error will recur when retried straight away"""
+        return False
+
+    async def get(self) -> T:
+        """Get the cached value, refreshing it if needed"""
+        try:
+            if self._should_refresh():
+                attempts = self._refresh_attempts
+                async with self._refresh_lock:
+                    if self._should_refresh():
+                        if self._refresh_attempts != attempts and self._refresh_error is not None:
+                            # A refresh failed while we waited; share its outcome instead of retrying
+                            raise self._refresh_error
+                        self._raise_if_negatively_cached()
+                        await self._refresh()
+            elif self._should_prefetch():
+                self._schedule_background_refresh()
+            return self.cached_value
+        except HTTPException:
+            raise
+        except Exception as e:
+            self.clear_cache()
+            raise HTTPException(
+                status_code=500,
+                detail=f"Failed to get {self.name}: {str(e)}"
+            )
+
+    async def run_refresher(self) -> None:
+        """Refresh the value ahead of expiry for as long as the app runs"""
+        while True:
+            await asyncio.sleep(self._seconds_until_prefetch())
+            try:
+                async with self._refresh_lock:
+                    if self._should_refresh() or self._should_prefetch():
+                        self._raise_if_negatively_cached()
+                        await self._refresh()
+            except Exception:
+                # Callers still refresh on demand; retry after a back-off
+                await asyncio.sleep(self.negative_cache_ttl)
+
+    def _should_refresh(self) -> bool:
+        """Check if the value must be refreshed before it can be used"""
+        if self.cached_value is None or self.expiry is None:
+            return True
+
+        return time.monotonic() >= (self.expiry - self.refresh_buffer)
+
+    def _should_prefetch(self) -> bool:
+        """Check if a still-valid value is close enough to expiry to refresh early"""
+        if self.expiry is None:
+            return False
+
+        return time.monotonic() >= self._prefetch_at()
+
+    def _seconds_until_prefetch(self) -> float:
+        """Seconds until the cached value enters the early refresh window"""
+        if self.expiry is None:
+            return 0
+
+        return max(self._prefetch_at() - time.monotonic(), 0)
+
+    def _prefetch_at(self) -> float:
+        """Monotonic time from which an early refresh may start"""
+        prefetch_at = self.expiry - 2 * self.refresh_buffer
+        if self._last_refresh_attempt is not None:
+            # A TTL shorter than the refresh window must not cause back-to-back refreshes
+            prefetch_at = max(prefetch_at, self._last_refresh_attempt + self.min_refresh_interval)
+        return prefetch_at
+
+    def _raise_if_negatively_cached(self) -> None:
+        """Fail fast while a recent permanent failure is still cached"""
+        if not self._negative_cache:
+            return
+
+        until, error = self._negative_cache
+        if time.monotonic() < until:
+            raise HTTPException(
+                status_code=403,
+                detail=f"{self.name} unavailable: {str(error)}"
+            )
+        self._negative_cache = None
+
+    def _schedule_background_refresh(self) -> None:
+        """Start a refresh without blocking the caller, unless one is already running"""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._background_refresh())
+
+    async def _background_refresh(self) -> None:
+        """Refresh the value ahead of expiry, keeping the cached one on failure"""
+        async with self._refresh_lock:
+            if not self._should_prefetch():
+                return
+            try:
+                self._raise_if_negatively_cached()
+                await self._refresh()
+            except Exception:
+                # Cached value is still valid; the next caller retries
+                pass
+
+    async def _refresh(self) -> None:
+        """Replace the cached value, recording permanent failures"""
+        self._last_refresh_attempt = time.monotonic()
+        try:
+            # Fetching is blocking I/O, keep it off the event loop
+            loop = asyncio.get_running_loop()
+            self.cached_value, self.expiry = await loop.run_in_executor(self._refresh_executor, self._load)
+        except Exception as e:
+            self._refresh_error = e
+            if self._is_permanent_failure(e):
+                self._negative_cache = (time.monotonic() + self.negative_cache_ttl, e)
+            raise
+        else:
+            self._refresh_error = None
+            self._negative_cache = None
+        finally:
+            self._refresh_attempts += 1
+
+    def _load(self) -> Tuple[T, float]:
+        """Reuse a value another worker already fetched, or fetch and share one (blocking)"""
+        if not self._shared_cache:
+            return self._fetch_until()
+
+        with self._shared_cache.lock():
+            entry = self._shared_cache.read()
+            # CLOCK_MONOTONIC is host-wide, so deadlines are comparable across workers
+            deadline = entry.get('deadline') if entry else None
+            if isinstance(deadline, (int, float)) and 'value' in entry:
+                if time.monotonic() < deadline - 2 * self.refresh_buffer:
+                    return entry['value'], deadline
+
+            value, deadline = self._fetch_until()
+            self._shared_cache.write({'value': value, 'deadline': deadline})
+            return value, deadline
+
+    def _fetch_until(self) -> Tuple[T, float]:
+        """Fetch a fresh value along with its monotonic deadline (blocking)"""
+        value, ttl = self._fetch()
+        return value, time.monotonic() + ttl
+
+    def close(self) -> None:
+        """Stop refreshing and detach from the copy shared with other workers"""
+        self._refresh_executor.shutdown(wait=False)
+        if self._shared_cache:
+            self._shared_cache.close()
+            self._shared_cache = None
+
+    def add_clear_listener(self, listener: Callable[[], None]) -> None:
+        """Register a callback to run whenever the cache is cleared"""
+        self._clear_listeners.append(listener)
+
+    def clear_cache(self) -> None:
+        """Clear the cached value"""
+        self.cached_value = None
+        self.expiry = None
+        for listener in self._clear_listeners:
+            listener()
@@ -1,39 +1,172 @@
-from fastapi import FastAPI, HTTPException
+import asyncio
+import functools
+import msgspec
+import os
+from concurrent.futures import ThreadPoolExecutor
+from botocore.response import StreamingBody
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
 from auth.aws_credentials import AWSCredentialsManager
 from services.bedrock_client import BedrockClientManager
 from services.gcp_gateway import GCPGatewayClient
 from models.request_models import ProxyRequest
 from models.response_models import ProxyResponse
+from typing import AsyncIterator, Dict, Any, Iterator, Optional
 
 app = FastAPI()
 
+# Bodies larger than this are streamed as-is rather than wrapped in ProxyResponse
+STREAM_BODY_THRESHOLD = int(os.getenv("STREAM_BODY_THRESHOLD", str(1024 * 1024)))
+STREAM_CHUNK_SIZE = 64 * 1024
+
 # Initialize services
 credentials_manager = AWSCredentialsManager()
 bedrock_client_manager = BedrockClientManager(credentials_manager)
 gcp_gateway = GCPGatewayClient()
 
+@app.on_event("startup")
+async def startup() -> None:
+    # boto3 calls run in the default executor, size it for the expected concurrency
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=bedrock_client_manager.max_concurrency)
+    )
+
+    # Pay the federation + STS exchange before the first request does
+    try:
+        await credentials_manager.get_credentials()
+        await bedrock_client_manager.get_client("InvokeModel")
+        await gcp_gateway.token_manager.get_token()
+    except HTTPException:
+        # Not fatal: /ready stays unavailable and requests retry on demand
+        pass
+    app.state.credentials_refresher = asyncio.create_task(credentials_manager.run_refresher())
+
+@app.on_event("shutdown")
+async def shutdown() -> None:
+    app.state.credentials_refresher.cancel()
+    credentials_manager.close()
+    await gcp_gateway.close()
+
+@app.get("/ready")
+async def ready() -> Dict[str, str]:
+    if credentials_manager.cached_value is None:
+        raise HTTPException(
+            status_code=503,
+            detail="AWS credentials not loaded"
+        )
+    return {"status": "ready"}
+
+def _discard(task: asyncio.Task) -> None:
+    """Let an unneeded task finish in the background without logging its outcome"""
+    # Not cancelled: it may be mid credentials refresh, which the next request can reuse
+    task.add_done_callback(lambda t: t.cancelled() or t.exception())
+
+async def clean_response(response: Dict[str, Any]) -> Dict[str, Any]:
+    """Decode the Bedrock response body so it can be serialized, leaving other keys untouched"""
+    body = response.get('body')
+    if isinstance(body, StreamingBody):
+        # Reading drains the HTTP connection, keep it off the event loop
+        body = await asyncio.get_running_loop().run_in_executor(None, body.read)
+    if isinstance(body, bytes):
+        return {**response, 'body': body.decode('utf-8')}
+    return response
+
+def content_length(response: Dict[str, Any]) -> Optional[int]:
+    """Get the Bedrock response body size from its headers, if reported"""
+    length = response.get('ResponseMetadata', {}).get('HTTPHeaders', {}).get('content-length')
+    return int(length) if length else None
+
+async def iterate_in_executor(iterator: Iterator[Any]) -> AsyncIterator[Any]:
+    """Drive a blocking iterator without blocking the event loop on each item"""
+    loop = asyncio.get_running_loop()
+    done = object()
+    while True:
+        item = await loop.run_in_executor(None, next, iterator, done)
+        if item is done:
+            return
+        yield item
+
+async def stream_body(body: StreamingBody) -> AsyncIterator[bytes]:
+    """Relay a large response body in fixed-size chunks instead of buffering it"""
+    try:
+        async for chunk in iterate_in_executor(body.iter_chunks(STREAM_CHUNK_SIZE)):
+            yield chunk
+    finally:
+        body.close()
+
+async def stream_response_body(response: Dict[str, Any]) -> AsyncIterator[bytes]:
+    """Relay streamed model output chunk by chunk as newline-delimited JSON"""
+    event_stream = response['body']
+    try:
+        async for event in iterate_in_executor(iter(event_stream)):
+            if 'chunk' in event:
+                yield event['chunk']['bytes'] + b"\n"
+    finally:
+        event_stream.close()
+
 @app.post("/predict")
-async def predict(request: ProxyRequest) -> ProxyResponse:
+async def predict(raw: Request) -> Response:
+    # Decode and validate with msgspec rather than a pydantic model
+    try:
+        request = msgspec.json.decode(await raw.body(), type=ProxyRequest)
+    except msgspec.MsgspecError as e:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Invalid request: {str(e)}"
+        )
+
+    # Acquire the Bedrock operation while the gateway validates, so a credentials
+    # refresh overlaps the gateway round trip instead of following it
+    gateway_task = asyncio.create_task(gcp_gateway.validate_request(msgspec.json.encode(request)))
+    operation_task = asyncio.create_task(bedrock_client_manager.get_operation(request.bedrock_api.operation))
     try:
         # Validate with GCP Gateway
-        gateway_response = await gcp_gateway.validate_request(request.dict())
+        try:
+            gateway_response = await gateway_task
+        except BaseException:
+            _discard(operation_task)
+            raise
         
         if gateway_response.get("status") != "approved":
+            _discard(operation_task)
             raise HTTPException(
                 status_code=403,
                 detail="Request not approved by GCP Gateway"
             )
 
-        # Get Bedrock client and make request
-        client = await bedrock_client_manager.get_client(request.bedrock_api.operation)
-        operation_method = getattr(client, request.bedrock_api.operation.lower())
-        response = operation_method(**request.bedrock_api.request_payload)
+        # Make request with the already acquired Bedrock operation
+        operation_method = await operation_task
+        # boto3 is synchronous, keep the Bedrock call off the event loop
+        loop = asyncio.get_running_loop()
+        response = await loop.run_in_executor(
+            None,
+            functools.partial(operation_method, **request.bedrock_api.request_payload)
+        )
+
+        if request.bedrock_api.operation.endswith("WithResponseStream"):
+            return StreamingResponse(
+                stream_response_body(response),
+                media_type="application/x-ndjson"
+            )
 
-        return ProxyResponse(
+        body = response.get('body')
+        if isinstance(body, StreamingBody) and (content_length(response) or 0) > STREAM_BODY_THRESHOLD:
+            return StreamingResponse(
+                stream_body(body),
+                media_type=response.get('contentType', 'application/octet-stream')
+            )
+
+        proxy_response = ProxyResponse(
             status="success",
             operation=request.bedrock_api.operation,
-            response=response
+            response=await clean_response(response)
+        )
+        return Response(
+            content=msgspec.json.encode(proxy_response),
+            media_type="application/json"
         )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
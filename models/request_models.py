@@ -0,0 +1,11 @@
+# models/request_models.py
+import msgspec
+from typing import Dict, Any, Optional
+
+class BedrockAPI(msgspec.Struct):
+    operation: str
+    request_payload: Dict[str, Any]
+    metadata: Optional[Dict[str, Any]] = None
+
+class ProxyRequest(msgspec.Struct):
+    bedrock_api: BedrockAPI
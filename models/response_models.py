@@ -0,0 +1,8 @@
+# models/response_models.py
+import msgspec
+from typing import Dict, Any
+
+class ProxyResponse(msgspec.Struct):
+    status: str
+    operation: str
+    response: Dict[str, Any]
@@ -1,44 +1,108 @@
 from botocore.config import Config
 import boto3
-from typing import Dict, Any
+import functools
+import os
+import re
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Any, Tuple
 from auth.aws_credentials import AWSCredentialsManager
 
-class BedrockClientManager:
-    _instances = {}
+_PASCAL_RE = re.compile(r'(?<!^)(?=[A-Z])')
+
+@functools.lru_cache(maxsize=512)
+def to_snake_case(operation: str) -> str:
+    """Convert a Bedrock API operation name (InvokeModel) to its boto3 method name (invoke_model)"""
+    return _PASCAL_RE.sub('_', operation).lower()
+
+BEDROCK_SERVICES = {
+    "runtime": "bedrock-runtime",
+    "agent": "bedrock-agent",
+    "default": "bedrock"
+}
+
+# Bounded: operation names come straight from requests, including junk ones
+@functools.lru_cache(maxsize=256)
+def determine_service(operation: str) -> str:
+    """Pick the Bedrock service an operation belongs to"""
+    operation_lower = operation.lower()
+    if operation_lower.startswith(("invoke", "stream")):
+        return BEDROCK_SERVICES["runtime"]
+    elif operation_lower.startswith("agent"):
+        return BEDROCK_SERVICES["agent"]
+    return BEDROCK_SERVICES["default"]
 
+class BedrockClientManager:
     def __init__(self, credentials_manager: AWSCredentialsManager):
         self.credentials_manager = credentials_manager
         self.aws_region = os.getenv("AWS_REGION", "us-east-1")
-        self.bedrock_services = {
-            "runtime": "bedrock-runtime",
-            "agent": "bedrock-agent",
-            "default": "bedrock"
-        }
+        # Concurrent Bedrock calls, each one holds a pooled connection
+        self.max_concurrency = int(os.getenv("BEDROCK_MAX_CONCURRENCY", "64"))
+        # Clients keyed by (service, credentials expiry) so they are only
+        # rebuilt when STS hands out a new set of credentials
+        self._instances: "OrderedDict[Tuple[str, float], Any]" = OrderedDict()
+        self.max_clients = 16
+        # Bound methods per operation, with the client they were taken from
+        self._operation_methods: Dict[str, Tuple[Any, Callable[..., Any]]] = {}
+
+        # Drop clients signing with rotated credentials
+        credentials_manager.add_clear_listener(self.clear)
 
     async def get_client(self, operation: str):
         """Get the appropriate Bedrock client based on the operation"""
-        service = self._determine_service(operation)
+        service = determine_service(operation)
         credentials = await self.credentials_manager.get_credentials()
-        
-        config = Config(
-            region_name=self.aws_region,
-            credentials={
-                'aws_access_key_id': credentials['AccessKeyId'],
-                'aws_secret_access_key': credentials['SecretAccessKey'],
-                'aws_session_token': credentials['SessionToken']
-            }
-        )
-        
-        self._instances[service] = boto3.client(
+        expiry = self.credentials_manager.expiry
+
+        key = (service, expiry)
+        if key in self._instances:
+            self._instances.move_to_end(key)
+            return self._instances[key]
+
+        self._evict_expired()
+        while len(self._instances) >= self.max_clients:
+            _, evicted = self._instances.popitem(last=False)
+            self._close_client(evicted)
+
+        self._instances[key] = boto3.client(
             service,
-            config=config
+            aws_access_key_id=credentials['aws_access_key_id'],
+            aws_secret_access_key=credentials['aws_secret_access_key'],
+            aws_session_token=credentials['aws_session_token'],
+            config=Config(
+                region_name=self.aws_region,
+                max_pool_connections=self.max_concurrency
+            )
         )
-        return self._instances[service]
-
-    def _determine_service(self, operation: str) -> str:
-        operation_lower = operation.lower()
-        if operation_lower.startswith(("invoke", "stream")):
-            return self.bedrock_services["runtime"]
-        elif operation_lower.startswith("agent"):
-            return self.bedrock_services["agent"]
-        return self.bedrock_services["default"]
+        return self._instances[key]
+
+    async def get_operation(self, operation: str) -> Callable[..., Any]:
+        """Get the boto3 method implementing the operation on the appropriate client"""
+        client = await self.get_client(operation)
+        cached = self._operation_methods.get(operation)
+        if cached is not None and cached[0] is client:
+            return cached[1]
+
+        method = getattr(client, to_snake_case(operation))
+        self._operation_methods[operation] = (client, method)
+        return method
+
+    def _evict_expired(self) -> None:
+        """Drop clients signing with credentials that have already expired"""
+        now = time.monotonic()
+        for key in [k for k in self._instances if k[1] is None or k[1] < now]:
+            self._close_client(self._instances.pop(key))
+
+    def clear(self) -> None:
+        """Close and drop every cached client"""
+        self._operation_methods.clear()
+        while self._instances:
+            _, client = self._instances.popitem()
+            self._close_client(client)
+
+    def _close_client(self, client: Any) -> None:
+        """Forget the client's cached methods and release its pooled connections"""
+        stale = [op for op, (owner, _) in self._operation_methods.items() if owner is client]
+        for operation in stale:
+            del self._operation_methods[operation]
+        client._endpoint.http_session.close()
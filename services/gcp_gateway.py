@@ -14,30 +14,38 @@ class GCPGatewayClient:
         if not self.gateway_url:
             raise ValueError("Missing GCP_GATEWAY_URL configuration")
 
-    async def validate_request(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        # Long-lived client so connections to the gateway are kept alive
+        self._client = httpx.AsyncClient(
+            timeout=self.timeout,
+            limits=httpx.Limits(max_connections=200, max_keepalive_connections=100)
+        )
+
+    async def validate_request(self, payload: bytes) -> Dict[str, Any]:
         """
-        Validate the request through GCP API Gateway
+        Validate the request through GCP API Gateway, given the JSON-encoded payload
         """
         try:
+            # Headers already carry Content-Type: application/json
             headers = await self.token_manager.get_authorization_headers()
             
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.post(
-                    self.gateway_url,
-                    json=payload,
-                    headers=headers
+            response = await self._client.post(
+                self.gateway_url,
+                content=payload,
+                headers=headers
+            )
+            response.raise_for_status()
+            
+            validation_response = response.json()
+            if validation_response.get("status") != "approved":
+                raise HTTPException(
+                    status_code=403,
+                    detail="Request not approved by GCP Gateway"
                 )
-                response.raise_for_status()
-                
-                validation_response = response.json()
-                if validation_response.get("status") != "approved":
-                    raise HTTPException(
-                        status_code=403,
-                        detail="Request not approved by GCP Gateway"
-                    )
-                    
-                return validation_response
                 
+            return validation_response
+            
+        except HTTPException:
+            raise
         except httpx.HTTPError as e:
             raise HTTPException(
                 status_code=500,
@@ -48,3 +56,8 @@ class GCPGatewayClient:
                 status_code=500,
                 detail=f"Validation error: {str(e)}"
             )
+
+    async def close(self) -> None:
+        """Close the underlying HTTP connection pool and token cache"""
+        await self._client.aclose()
+        self.token_manager.close()
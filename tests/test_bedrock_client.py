@@ -0,0 +1,149 @@
+import asyncio
+import time
+
+import pytest
+
+from auth.aws_credentials import AWSCredentialsManager
+from services.bedrock_client import BedrockClientManager, determine_service
+
+CREDENTIALS = {
+    "aws_access_key_id": "AKIDEXAMPLE",
+    "aws_secret_access_key": "secret",
+    "aws_session_token": "token",
+}
+
+class StubCredentials:
+    """Hands out fixed credentials with an expiry the test controls"""
+
+    def __init__(self):
+        self.expiry = time.monotonic() + 3600
+        self._listeners = []
+
+    async def get_credentials(self):
+        return CREDENTIALS
+
+    def add_clear_listener(self, listener):
+        self._listeners.append(listener)
+
+    def clear_cache(self):
+        for listener in self._listeners:
+            listener()
+
+def track_close(client, closed):
+    """Record when the client's pooled connections are released"""
+    session = client._endpoint.http_session
+    close = session.close
+
+    def recording_close():
+        closed.append(client)
+        close()
+
+    session.close = recording_close
+    return client
+
+@pytest.fixture
+def credentials():
+    return StubCredentials()
+
+@pytest.fixture
+def manager(credentials):
+    return BedrockClientManager(credentials)
+
+def test_operations_map_to_services():
+    assert determine_service("InvokeModel") == "bedrock-runtime"
+    assert determine_service("InvokeModelWithResponseStream") == "bedrock-runtime"
+    assert determine_service("AgentAlias") == "bedrock-agent"
+    assert determine_service("ListFoundationModels") == "bedrock"
+
+def test_client_is_reused_while_credentials_are_unchanged(manager):
+    async def run():
+        return await manager.get_client("InvokeModel"), await manager.get_client("InvokeModelWithResponseStream")
+
+    first, second = asyncio.run(run())
+    assert first is second
+    assert len(manager._instances) == 1
+
+def test_least_recently_used_client_is_evicted(manager):
+    manager.max_clients = 2
+    closed = []
+
+    async def run():
+        runtime = track_close(await manager.get_client("InvokeModel"), closed)
+        default = track_close(await manager.get_client("ListFoundationModels"), closed)
+        await manager.get_operation("InvokeModel")
+        await manager.get_operation("ListFoundationModels")
+        # Touch runtime so the default client is the least recently used
+        await manager.get_client("InvokeModel")
+        agent = await manager.get_client("AgentAlias")
+        return runtime, default, agent
+
+    runtime, default, agent = asyncio.run(run())
+    assert closed == [default]
+    assert list(manager._instances.values()) == [runtime, agent]
+    assert "ListFoundationModels" not in manager._operation_methods
+    assert manager._operation_methods["InvokeModel"][0] is runtime
+
+def test_clients_with_expired_credentials_are_evicted(manager, credentials):
+    closed = []
+    credentials.expiry = time.monotonic() - 1
+
+    async def run():
+        stale = track_close(await manager.get_client("InvokeModel"), closed)
+        credentials.expiry = time.monotonic() + 3600
+        await manager.get_client("ListFoundationModels")
+        return stale
+
+    stale = asyncio.run(run())
+    assert closed == [stale]
+    assert [key[0] for key in manager._instances] == ["bedrock"]
+
+def test_operation_is_rebound_when_client_is_rebuilt(manager, credentials):
+    closed = []
+
+    async def run():
+        old_client = track_close(await manager.get_client("InvokeModel"), closed)
+        old_method = await manager.get_operation("InvokeModel")
+        assert await manager.get_operation("InvokeModel") is old_method
+
+        # Rotated credentials mean a new client for the same service
+        credentials.expiry = time.monotonic() + 7200
+        new_method = await manager.get_operation("InvokeModel")
+        return old_client, old_method, new_method
+
+    old_client, old_method, new_method = asyncio.run(run())
+    assert new_method is not old_method
+    assert new_method.__self__ is not old_client
+    assert manager._operation_methods["InvokeModel"] == (new_method.__self__, new_method)
+
+def test_clear_closes_clients_and_drops_methods(manager, credentials):
+    closed = []
+
+    async def run():
+        client = track_close(await manager.get_client("InvokeModel"), closed)
+        await manager.get_operation("InvokeModel")
+        return client
+
+    client = asyncio.run(run())
+    credentials.clear_cache()
+    assert closed == [client]
+    assert not manager._instances
+    assert not manager._operation_methods
+
+def test_clearing_credentials_drops_clients(monkeypatch):
+    monkeypatch.setenv("AWS_ROLE_ARN", "arn:aws:iam::123456789012:role/proxy")
+    monkeypatch.setenv("WORKLOAD_IDENTITY_POOL", "https://sts.googleapis.com/v1/token")
+    monkeypatch.setenv("WORKLOAD_IDENTITY_PROVIDER", "provider")
+    credentials = AWSCredentialsManager()
+    credentials.cached_value = CREDENTIALS
+    credentials.expiry = time.monotonic() + 3600
+    manager = BedrockClientManager(credentials)
+
+    try:
+        asyncio.run(manager.get_operation("InvokeModel"))
+        assert manager._instances
+
+        credentials.clear_cache()
+        assert not manager._instances
+        assert not manager._operation_methods
+    finally:
+        credentials.close()
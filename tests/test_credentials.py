@@ -0,0 +1,67 @@
+import pytest
+from botocore.exceptions import ClientError
+from google.auth.exceptions import RefreshError
+from google.oauth2.utils import handle_error_response
+
+from auth.aws_credentials import AWSCredentialsManager
+from auth.gcp_credentials import GCPTokenManager, _oauth_error_code
+
+def oauth_error(code: str) -> Exception:
+    try:
+        handle_error_response(f'{{"error": "{code}", "error_description": "rejected"}}')
+    except Exception as e:
+        return e
+    raise AssertionError("handle_error_response did not raise")
+
+@pytest.fixture
+def aws_manager(monkeypatch):
+    monkeypatch.setenv("AWS_ROLE_ARN", "arn:aws:iam::123456789012:role/proxy")
+    monkeypatch.setenv("WORKLOAD_IDENTITY_POOL", "https://sts.googleapis.com/v1/token")
+    monkeypatch.setenv("WORKLOAD_IDENTITY_PROVIDER", "provider")
+    manager = AWSCredentialsManager()
+    yield manager
+    manager.close()
+
+@pytest.fixture
+def gcp_manager(monkeypatch):
+    monkeypatch.setenv("GCP_WORKLOAD_IDENTITY_POOL", "https://sts.googleapis.com/v1/token")
+    monkeypatch.setenv("GCP_PROVIDER_ID", "provider")
+    manager = GCPTokenManager()
+    yield manager
+    manager.close()
+
+@pytest.mark.parametrize("code, permanent", [
+    ("AccessDenied", True),
+    ("InvalidIdentityToken", True),
+    ("IDPRejectedClaim", True),
+    ("ExpiredTokenException", False),
+    ("IDPCommunicationError", False),
+    ("Throttling", False),
+])
+def test_aws_permanent_failures(aws_manager, code, permanent):
+    error = ClientError({"Error": {"Code": code, "Message": "rejected"}}, "AssumeRoleWithWebIdentity")
+    assert aws_manager._is_permanent_failure(error) is permanent
+
+def test_aws_other_errors_are_transient(aws_manager):
+    assert not aws_manager._is_permanent_failure(ValueError("AccessDenied"))
+
+@pytest.mark.parametrize("code, permanent", [
+    ("invalid_grant", True),
+    ("invalid_client", True),
+    ("unauthorized_client", True),
+    ("invalid_scope", True),
+    ("temporarily_unavailable", False),
+])
+def test_gcp_permanent_failures(gcp_manager, code, permanent):
+    assert gcp_manager._is_permanent_failure(oauth_error(code)) is permanent
+
+def test_gcp_retryable_errors_are_transient(gcp_manager):
+    error = RefreshError('{"error": "invalid_grant"}', retryable=True)
+    assert not gcp_manager._is_permanent_failure(error)
+    assert not gcp_manager._is_permanent_failure(ValueError("invalid_grant"))
+
+def test_oauth_error_code():
+    assert _oauth_error_code(oauth_error("invalid_grant")) == "invalid_grant"
+    assert _oauth_error_code(RefreshError("failed", {"error": "invalid_client"})) == "invalid_client"
+    assert _oauth_error_code(RefreshError("failed", b'{"error": "invalid_scope"}')) == "invalid_scope"
+    assert _oauth_error_code(RefreshError("failed", "<html>bad gateway</html>")) is None
@@ -0,0 +1,85 @@
+import os
+import stat
+
+import pytest
+
+from auth.shared_cache import SharedCredentialsCache, open_shared_cache
+
+@pytest.fixture
+def runtime_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("SHARED_CREDENTIALS_CACHE", "true")
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path))
+    return tmp_path
+
+def test_disabled_by_default(runtime_dir, monkeypatch):
+    monkeypatch.delenv("SHARED_CREDENTIALS_CACHE")
+    assert open_shared_cache("key") is None
+
+def test_entry_is_visible_to_other_instances(runtime_dir):
+    writer = SharedCredentialsCache("key")
+    reader = SharedCredentialsCache("key")
+    try:
+        with writer.lock():
+            writer.write({"value": "secret", "deadline": 1.0})
+        assert reader.read() == {"value": "secret", "deadline": 1.0}
+    finally:
+        writer.close()
+        reader.close()
+
+def test_files_are_private(runtime_dir):
+    cache = SharedCredentialsCache("key")
+    try:
+        directory = os.stat(os.path.dirname(cache._path))
+        entry = os.stat(cache._path)
+        assert stat.S_IMODE(directory.st_mode) == 0o700
+        assert stat.S_IMODE(entry.st_mode) == 0o600
+    finally:
+        cache.close()
+
+def test_refuses_directory_open_to_other_users(runtime_dir):
+    shared = runtime_dir / f"aiproxy-{os.getuid()}"
+    os.mkdir(shared)
+    os.chmod(shared, 0o755)
+    assert open_shared_cache("key") is None
+
+def test_refuses_symlinked_entry(runtime_dir):
+    private = runtime_dir / f"aiproxy-{os.getuid()}"
+    os.mkdir(private, 0o700)
+    target = runtime_dir / "elsewhere"
+    target.write_bytes(b"")
+    probe = SharedCredentialsCache("key")
+    path = probe._path
+    probe.close()
+    os.unlink(path)
+    os.symlink(target, path)
+    assert open_shared_cache("key") is None
+
+def test_corrupt_entry_reads_as_missing(runtime_dir):
+    cache = SharedCredentialsCache("key")
+    try:
+        with cache.lock():
+            cache.write({"value": "secret", "deadline": 1.0})
+        cache._buf[4:9] = b'{"va\xff'
+        assert cache.read() is None
+
+        cache._HEADER.pack_into(cache._buf, 0, cache.SIZE)
+        assert cache.read() is None
+    finally:
+        cache.close()
+
+def test_close_keeps_entry(runtime_dir):
+    cache = SharedCredentialsCache("key")
+    with cache.lock():
+        cache.write({"value": "secret", "deadline": 1.0})
+    cache.close()
+
+    other = SharedCredentialsCache("key")
+    try:
+        assert other.read() == {"value": "secret", "deadline": 1.0}
+    finally:
+        other.close()
+
+def test_disabled_without_memory_backed_directory(runtime_dir, monkeypatch):
+    monkeypatch.delenv("XDG_RUNTIME_DIR")
+    monkeypatch.setattr(os.path, "isdir", lambda path: False)
+    assert open_shared_cache("key") is None
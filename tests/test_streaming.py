@@ -0,0 +1,75 @@
+import asyncio
+import importlib
+import io
+
+import pytest
+from botocore.response import StreamingBody
+
+class FakeEventStream:
+    """Iterable of Bedrock stream events that records being closed"""
+
+    def __init__(self, events):
+        self.events = events
+        self.closed = False
+
+    def __iter__(self):
+        return iter(self.events)
+
+    def close(self):
+        self.closed = True
+
+@pytest.fixture
+def main(monkeypatch):
+    monkeypatch.setenv("AWS_ROLE_ARN", "arn:aws:iam::123456789012:role/proxy")
+    monkeypatch.setenv("WORKLOAD_IDENTITY_POOL", "https://sts.googleapis.com/v1/token")
+    monkeypatch.setenv("WORKLOAD_IDENTITY_PROVIDER", "provider")
+    monkeypatch.setenv("GCP_WORKLOAD_IDENTITY_POOL", "https://sts.googleapis.com/v1/token")
+    monkeypatch.setenv("GCP_PROVIDER_ID", "provider")
+    monkeypatch.setenv("GCP_GATEWAY_URL", "https://gateway.example.com/validate")
+    return importlib.import_module("main")
+
+def streaming_body(data: bytes):
+    raw = io.BytesIO(data)
+    return StreamingBody(raw, len(data)), raw
+
+async def collect(chunks):
+    return [chunk async for chunk in chunks]
+
+def test_stream_body_relays_chunks_and_closes(main):
+    data = bytes(range(256)) * 600
+    body, raw = streaming_body(data)
+
+    chunks = asyncio.run(collect(main.stream_body(body)))
+    assert b"".join(chunks) == data
+    assert all(len(chunk) <= main.STREAM_CHUNK_SIZE for chunk in chunks)
+    assert len(chunks) > 1
+    assert raw.closed
+
+def test_stream_body_closes_when_client_goes_away(main):
+    body, raw = streaming_body(b"x" * (3 * main.STREAM_CHUNK_SIZE))
+
+    async def run():
+        chunks = main.stream_body(body)
+        await chunks.__anext__()
+        await chunks.aclose()
+
+    asyncio.run(run())
+    assert raw.closed
+
+def test_stream_response_body_yields_ndjson_and_closes(main):
+    events = FakeEventStream([
+        {"chunk": {"bytes": b'{"completion": "Hel"}'}},
+        {"metadata": {"usage": {}}},
+        {"chunk": {"bytes": b'{"completion": "lo"}'}},
+    ])
+
+    chunks = asyncio.run(collect(main.stream_response_body({"body": events})))
+    assert chunks == [b'{"completion": "Hel"}\n', b'{"completion": "lo"}\n']
+    assert events.closed
+
+def test_clean_response_reads_and_decodes_body(main):
+    body, raw = streaming_body(b'{"completion": "Hello"}')
+    response = {"contentType": "application/json", "body": body}
+
+    cleaned = asyncio.run(main.clean_response(response))
+    assert cleaned == {"contentType": "application/json", "body": '{"completion": "Hello"}'}
@@ -0,0 +1,179 @@
+import asyncio
+import time
+
+import pytest
+from fastapi import HTTPException
+
+from auth.ttl_cache import TTLRefreshCache
+
+class CountingCache(TTLRefreshCache[str]):
+    def __init__(self, ttl: float = 3600, delay: float = 0, shared_key=None):
+        super().__init__("test value", shared_key=shared_key)
+        self.ttl = ttl
+        self.delay = delay
+        self.calls = 0
+
+    def _fetch(self):
+        self.calls += 1
+        time.sleep(self.delay)
+        return f"value-{self.calls}", self.ttl
+
+class FailingCache(TTLRefreshCache[str]):
+    def __init__(self, permanent: bool, delay: float = 0):
+        super().__init__("test value")
+        self.permanent = permanent
+        self.delay = delay
+        self.calls = 0
+
+    def _fetch(self):
+        self.calls += 1
+        time.sleep(self.delay)
+        raise ValueError("denied")
+
+    def _is_permanent_failure(self, error):
+        return self.permanent
+
+def test_subclass_without_fetch_cannot_be_constructed():
+    class Incomplete(TTLRefreshCache[str]):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete("incomplete")
+
+def test_concurrent_callers_share_one_fetch():
+    cache = CountingCache(delay=0.05)
+
+    async def run():
+        return await asyncio.gather(*[cache.get() for _ in range(20)])
+
+    assert set(asyncio.run(run())) == {"value-1"}
+    assert cache.calls == 1
+
+def test_value_is_reused_until_refresh_window():
+    cache = CountingCache()
+
+    async def run():
+        await cache.get()
+        return await cache.get()
+
+    assert asyncio.run(run()) == "value-1"
+    assert cache.calls == 1
+
+def test_early_refresh_runs_in_background():
+    cache = CountingCache()
+
+    async def run():
+        await cache.get()
+        # Still valid, but inside twice the refresh buffer
+        cache.expiry = time.monotonic() + 1.5 * cache.refresh_buffer
+        cache._last_refresh_attempt = None
+        stale = await cache.get()
+        await cache._refresh_task
+        return stale, cache.cached_value
+
+    assert asyncio.run(run()) == ("value-1", "value-2")
+
+def test_permanent_failure_is_negatively_cached():
+    cache = FailingCache(permanent=True)
+
+    async def run():
+        statuses = []
+        for _ in range(3):
+            with pytest.raises(HTTPException) as exc_info:
+                await cache.get()
+            statuses.append(exc_info.value.status_code)
+        return statuses
+
+    assert asyncio.run(run()) == [500, 403, 403]
+    assert cache.calls == 1
+
+def test_negative_cache_expires():
+    cache = FailingCache(permanent=True)
+    cache.negative_cache_ttl = 0
+
+    async def run():
+        for _ in range(2):
+            with pytest.raises(HTTPException):
+                await cache.get()
+
+    asyncio.run(run())
+    assert cache.calls == 2
+
+def test_transient_failure_is_retried():
+    cache = FailingCache(permanent=False)
+
+    async def run():
+        for _ in range(2):
+            with pytest.raises(HTTPException) as exc_info:
+                await cache.get()
+            assert exc_info.value.status_code == 500
+
+    asyncio.run(run())
+    assert cache.calls == 2
+
+def test_concurrent_callers_share_one_failed_fetch():
+    cache = FailingCache(permanent=False, delay=0.05)
+
+    async def run():
+        return await asyncio.gather(*[cache.get() for _ in range(10)], return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert all(isinstance(r, HTTPException) and r.status_code == 500 for r in results)
+    assert cache.calls == 1
+
+def test_failure_clears_cache_and_notifies_listeners():
+    cache = FailingCache(permanent=False)
+    cleared = []
+    cache.add_clear_listener(lambda: cleared.append(True))
+
+    async def run():
+        with pytest.raises(HTTPException):
+            await cache.get()
+
+    asyncio.run(run())
+    assert cleared == [True]
+    assert cache.cached_value is None
+
+def test_refresher_does_not_busy_loop_on_short_ttl():
+    # Below 2 * refresh_buffer, so the value is always inside the early refresh window
+    cache = CountingCache(ttl=500)
+
+    async def run():
+        refresher = asyncio.create_task(cache.run_refresher())
+        for _ in range(20):
+            await cache.get()
+            await asyncio.sleep(0.01)
+        refresher.cancel()
+
+    asyncio.run(run())
+    assert cache.calls == 1
+
+def test_shared_entry_is_reused_across_instances(tmp_path, monkeypatch):
+    monkeypatch.setenv("SHARED_CREDENTIALS_CACHE", "true")
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path))
+    first = CountingCache(shared_key="shared")
+    second = CountingCache(shared_key="shared")
+
+    async def run():
+        return await first.get(), await second.get()
+
+    try:
+        assert asyncio.run(run()) == ("value-1", "value-1")
+        assert (first.calls, second.calls) == (1, 0)
+    finally:
+        first.close()
+        second.close()
+
+def test_close_keeps_shared_entry_for_other_workers(tmp_path, monkeypatch):
+    monkeypatch.setenv("SHARED_CREDENTIALS_CACHE", "true")
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path))
+    cache = CountingCache(shared_key="shared")
+    asyncio.run(cache.get())
+    cache.close()
+
+    other = CountingCache(shared_key="shared")
+    try:
+        assert asyncio.run(other.get()) == "value-1"
+        assert other.calls == 0
+    finally:
+        other.close()